@@ -1,54 +1,97 @@
-import json
-import time
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from request_replayer import RequestReplayer
-from search_keywords import SEARCH_KEYWORDS
+import orjson
+
+from config.config import (
+    REPLAY_MAX_WORKERS,
+    REPLAY_MIN_RATE_PER_SEC,
+    REPLAY_RATE_PER_SEC,
+    RESULTS_DIR,
+    WRITE_BUFFER_SIZE,
+)
+from file_utils import atomic_write_bytes
+from request_replayer import RateLimiter, RequestReplayer, make_body_builder
+from search_keywords import INITIAL_KEYWORD, KEYWORDS_TO_SEARCH
+from search_results import (
+    JSON_DUMP_OPTIONS,
+    is_cached,
+    mark_cached,
+    request_digest,
+    result_writer,
+    search_keyword,
+)
+
+# Captured search requests, stored as JSON Lines
+CAPTURE_FILE = "captured_requests.jsonl"
 
 
 def search_all_keywords():
-    replayer = RequestReplayer()
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    rate_limiter = RateLimiter(REPLAY_RATE_PER_SEC, REPLAY_MIN_RATE_PER_SEC)
+    replayer = RequestReplayer(CAPTURE_FILE, rate_limiter=rate_limiter)
 
     try:
         captured = replayer.load_captured_requests()
         original_request = captured[0]
 
-        # First, save the initial "苹果" search result
-        with open(f"search_results_苹果.json", "w", encoding="utf-8") as f:
-            json.dump(original_request, f, ensure_ascii=False, indent=2)
-
-        # Load existing captured requests if file exists
-        try:
-            with open("captured_requests.json", "r", encoding="utf-8") as f:
-                captured_requests = json.load(f)
-        except FileNotFoundError:
-            captured_requests = []
-
-        for keyword in SEARCH_KEYWORDS:
-            if keyword == "苹果":
-                continue
+        # First, save the initial search result
+        initial_path = os.path.join(RESULTS_DIR, f"search_results_{INITIAL_KEYWORD}.json")
+        digest = request_digest(original_request)
+        if not is_cached(initial_path, digest):
+            atomic_write_bytes(initial_path, orjson.dumps(original_request, option=JSON_DUMP_OPTIONS))
+            mark_cached(initial_path, digest)
 
-            print(f"\nSearching for: {keyword}")
+        # Parse the body once; only the keywords field changes per search
+        body_template = orjson.loads(original_request["body"])
 
-            body_dict = json.loads(original_request["body"])
-            body_dict["keywords"] = keyword
-            original_request["body"] = json.dumps(body_dict, ensure_ascii=False)
+        # Everything but the body is shared by all keyword requests
+        request_base = {k: v for k, v in original_request.items() if k != "body"}
+        build_body = make_body_builder(body_template)
 
-            # Store and save the request immediately
-            current_request = original_request.copy()
-            captured_requests.append(current_request)
-            with open("captured_requests.json", "w", encoding="utf-8") as f:
-                json.dump(captured_requests, f, ensure_ascii=False, indent=2)
+        # Build every keyword request up front so they can be replayed concurrently,
+        # appending each one to the capture log as it is built
+        keyword_requests = []
+        with open(CAPTURE_FILE, "ab", buffering=WRITE_BUFFER_SIZE) as out:
+            for keyword in KEYWORDS_TO_SEARCH:
+                current_request = request_base | {"body": build_body(keyword)}
+                out.write(orjson.dumps(current_request))
+                out.write(b"\n")
 
-            result = replayer.replay_request(original_request)
-            if result:
-                with open(f"search_results_{keyword}.json", "w", encoding="utf-8") as f:
-                    json.dump(result, f, ensure_ascii=False, indent=2)
+                # Skip keywords whose results were saved for this exact request
+                digest = request_digest(current_request)
+                out_path = os.path.join(RESULTS_DIR, f"search_results_{keyword}.json")
+                if is_cached(out_path, digest):
+                    print(f"Using cached results for: {keyword}")
+                    continue
+                keyword_requests.append((keyword, out_path, current_request, digest))
 
-            time.sleep(0.5)  # 500ms delay between API calls
+        # Workers only fetch and encode; a single thread does all file writes
+        results = queue.Queue()
+        writer = threading.Thread(target=result_writer, args=(results,), daemon=True)
+        writer.start()
+        try:
+            with ThreadPoolExecutor(max_workers=REPLAY_MAX_WORKERS) as executor:
+                futures = {
+                    executor.submit(search_keyword, replayer, keyword, out_path, request, digest, results): keyword
+                    for keyword, out_path, request, digest in keyword_requests
+                }
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"Error processing keyword {futures[future]}: {str(e)}")
+        finally:
+            results.put(None)
+            writer.join()
 
     except Exception as e:
         print(f"Error in search_all_keywords: {str(e)}")
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     search_all_keywords()
@@ -6,12 +6,13 @@ import os
 from pathlib import Path
 
 # Project root directory
-PROJECT_ROOT = Path(__file__).parent.parent
+PROJECT_ROOT = Path(__file__).parent.parent.resolve()
 
 # Asset paths
 ASSETS_DIR = PROJECT_ROOT / "assets"
 DATA_DIR = PROJECT_ROOT / "data"
 LOGS_DIR = PROJECT_ROOT / "logs"
+RESULTS_DIR = PROJECT_ROOT / "results"
 
 # Image paths
 AGREE_BUTTON = ASSETS_DIR / "agree.png"
@@ -21,15 +22,43 @@ CLOSE_BUTTON = ASSETS_DIR / "close_button.png"
 NATIONWIDE_DELIVERY = ASSETS_DIR / "nationwide_delivery_icon.png"
 SEARCH_INPUT = ASSETS_DIR / "search_input.png"
 
+# String forms of the image paths, for APIs that take plain strings
+AGREE_BUTTON_STR = str(AGREE_BUTTON)
+LOCATION_BUTTON_STR = str(LOCATION_BUTTON)
+SELECT_LOCATION_STR = str(SELECT_LOCATION)
+CLOSE_BUTTON_STR = str(CLOSE_BUTTON)
+NATIONWIDE_DELIVERY_STR = str(NATIONWIDE_DELIVERY)
+SEARCH_INPUT_STR = str(SEARCH_INPUT)
+
 # Appium settings
 APPIUM_HOST = "127.0.0.1"
 APPIUM_PORT = 4723
+MJPEG_SERVER_PORT = 9100  # Host port for the UiAutomator2 screen stream
 
 # App settings
 APP_PACKAGE = "com.pagoda.buy"
 APP_ACTIVITY = ".ui.MainActivity"
 
 # Timeouts
-IMPLICIT_WAIT = 30
+IMPLICIT_WAIT = 0  # Lookups use explicit WebDriverWait instead
 INITIAL_WAIT = 15
 ELEMENT_WAIT = 10
+WAIT_POLL_FREQUENCY = 0.2  # Seconds between WebDriverWait polls
+POPUP_RECHECK_INTERVAL = 30  # Seconds before handle_popups looks for popups again
+
+# Image matching
+IMAGE_MATCH_THRESHOLD = 0.8  # Minimum normalized correlation for a template match
+IMAGE_POLL_INTERVAL = 0.5  # Seconds between screenshots while waiting for a match
+SCREENSHOT_TTL = 0.5  # Seconds a screenshot may be reused by back-to-back finders
+IMAGE_PYRAMID_LEVELS = 2  # Halvings for the coarse matching pass (2 = quarter size)
+COARSE_MATCH_RATIO = 0.8  # Fraction of the threshold a coarse hit needs to be refined
+MIN_TEMPLATE_SIDE = 8  # Smallest template side, in pixels, worth matching at a coarse level
+MJPEG_MAX_FRAME_BYTES = 8 << 20  # Give up on a stream that sends this much without a frame
+
+# File output
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB
+
+# Request replay settings
+REPLAY_MAX_WORKERS = 8
+REPLAY_RATE_PER_SEC = 4  # Upper bound, restored gradually after throttling
+REPLAY_MIN_RATE_PER_SEC = 0.5  # Floor when the server keeps returning 429/5xx
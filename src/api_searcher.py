@@ -1,82 +1,134 @@
-import json
-import time
+import os
+import queue
+import re
+import sys
 import logging
-
-from request_replayer import RequestReplayer
-from search_keywords import SEARCH_KEYWORDS
-from mitmproxy import io
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import orjson
+from file_utils import atomic_write_bytes, atomic_writer
+from request_replayer import RateLimiter, RequestReplayer, make_body_builder
+from search_keywords import INITIAL_KEYWORD, KEYWORDS_TO_SEARCH
+from search_results import (
+    JSON_DUMP_OPTIONS,
+    is_cached,
+    mark_cached,
+    request_digest,
+    result_writer,
+    search_keyword,
+)
+from mitmproxy import http
 from mitmproxy.exceptions import FlowReadException
-from mitmproxy.flow import Flow
-
-# Set up logging with debug level for development
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+from mitmproxy.io import compat, tnetstring
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from config.config import (
+    REPLAY_MAX_WORKERS,
+    REPLAY_MIN_RATE_PER_SEC,
+    REPLAY_RATE_PER_SEC,
+    RESULTS_DIR,
+    WRITE_BUFFER_SIZE,
 )
+
+# Captured search requests, stored as JSON Lines
+CAPTURE_FILE = "captured_requests.jsonl"
+
+# Matches search endpoints without lowercasing every URL
+SEARCH_URL_PATTERN = re.compile('search', re.IGNORECASE)
+SEARCH_PATH_PATTERN = re.compile(b'search', re.IGNORECASE)
+
 logger = logging.getLogger(__name__)
 
+def _may_be_search(raw_request):
+    """Check whether a raw request state could have "search" in its pretty_url.
+
+    pretty_url is built from the path and from the authority, the Host
+    header or the raw host, so any of those may carry the match.
+    """
+    if SEARCH_PATH_PATTERN.search(raw_request.get('path') or b''):
+        return True
+    hosts = [raw_request.get('host'), raw_request.get('authority')]
+    hosts.extend(value for name, value in raw_request.get('headers') or () if name.lower() == b'host')
+    for value in hosts:
+        if not value:
+            continue
+        pattern = SEARCH_PATH_PATTERN if isinstance(value, bytes) else SEARCH_URL_PATTERN
+        if pattern.search(value):
+            return True
+    return False
+
+def iter_search_requests(fp):
+    """Yield search requests from an open mitmproxy flow file, one at a time.
+
+    Flows are read as raw tnetstring state, and only those whose path, host,
+    authority or Host header mentions "search" are turned into full HTTPFlow
+    objects; their pretty_url then decides, as it did before.
+    """
+    flow_count = 0
+    while True:
+        try:
+            state = tnetstring.load(fp)
+        except (ValueError, TypeError, IndexError) as e:
+            # Same end-of-file condition FlowReader.stream() stops on
+            if str(e) == "not a tnetstring: empty file":
+                return
+            raise FlowReadException("Invalid data format.")
+        flow_count += 1
+
+        try:
+            state = compat.migrate_flow(state)
+        except ValueError as e:
+            raise FlowReadException(str(e))
+
+        # Only HTTP flows can carry search requests
+        if state.get('type') != 'http':
+            continue
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Processing flow #%d", flow_count)
+
+        if not _may_be_search(state.get('request') or {}):
+            continue
+
+        try:
+            request = http.HTTPFlow.from_state(state).request
+        except Exception as e:
+            logger.error("Error processing flow: %s", e)
+            continue
+
+        if not SEARCH_URL_PATTERN.search(request.pretty_url):
+            continue
+
+        request_data = {
+            'url': request.pretty_url,
+            'method': request.method,
+            'headers': dict(request.headers),
+        }
+        if request.content:
+            request_data['body'] = request.content.decode('utf-8', errors='ignore')
+
+        yield request_data
+
 def convert_flow_to_json():
-    """Convert mitmproxy flow file to JSON format."""
-    captured_requests = []
+    """Convert mitmproxy flow file to JSON Lines format, one request per line."""
+    captured_count = 0
     
     try:
         logger.info("Opening traffic.flow file...")
-        with open('traffic.flow', 'rb') as fp:
-            reader = io.FlowReader(fp)
-            flow_count = 0
-            for flow in reader.stream():
-                flow_count += 1
-                try:
-                    # Log detailed flow information for debugging
-                    logger.debug(f"Processing flow #{flow_count}")
-                    logger.debug(f"Flow object type: {type(flow)}")
-                    logger.debug(f"Flow object attributes: {dir(flow)}")
-                    
-                    if not isinstance(flow, Flow):
-                        logger.warning(f"Flow object is not an instance of mitmproxy.flow.Flow: {type(flow)}")
-                        continue
-
-                    # Check if flow has request attribute using getattr
-                    request = getattr(flow, 'request', None)
-                    if request is None:
-                        logger.warning(f"Flow object missing request attribute: {type(flow)}")
-                        continue
-                    
-                    # Check if request has pretty_url
-                    pretty_url = getattr(request, 'pretty_url', None)
-                    if pretty_url is None:
-                        logger.warning("Flow request missing pretty_url attribute")
-                        continue
-                    
-                    # Log all URLs being processed
-                    logger.info(f"Processing URL: {pretty_url}")
-                    
-                    if 'search' in pretty_url.lower():
-                        request_data = {
-                            'url': pretty_url,
-                            'method': getattr(request, 'method', None),
-                            'headers': dict(getattr(request, 'headers', {})),
-                        }
-                        
-                        # Handle request body
-                        if hasattr(request, 'content') and request.content:
-                            try:
-                                body = request.content.decode('utf-8', errors='ignore')
-                                request_data['body'] = body
-                            except Exception as e:
-                                logger.error(f"Could not decode request body for {pretty_url}: {str(e)}")
-                                continue
-                        
-                        captured_requests.append(request_data)
-                        logger.info(f"Successfully captured request for URL: {pretty_url}")
-                except AttributeError as ae:
-                    logger.error(f"Attribute error processing flow: {str(ae)}")
-                    continue
-                except Exception as e:
-                    logger.error(f"Error processing flow: {str(e)}")
-                    continue
+        with open('traffic.flow', 'rb') as fp, \
+                atomic_writer(CAPTURE_FILE, buffering=WRITE_BUFFER_SIZE) as out:
+            for request_data in iter_search_requests(fp):
+                out.write(orjson.dumps(request_data))
+                out.write(b"\n")
+                captured_count += 1
+                logger.info("Successfully captured request for URL: %s", request_data['url'])
                     
-        if not captured_requests:
+        if not captured_count:
             logger.warning("No search requests found in traffic.flow")
             return False
             
@@ -84,20 +136,14 @@ def convert_flow_to_json():
         logger.error("No traffic.flow file found")
         return False
     except FlowReadException as e:
-        logger.error(f"Error reading flow file: {e}")
+        logger.error("Error reading flow file: %s", e)
         return False
     except Exception as e:
-        logger.error(f"Unexpected error processing flow file: {str(e)}")
-        return False
-        
-    try:
-        with open('captured_requests.json', 'w', encoding='utf-8') as f:
-            json.dump(captured_requests, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Failed to save captured requests: {str(e)}")
+        logger.error("Unexpected error processing flow file: %s", e)
         return False
 
+    return True
+
 def search_all_keywords():
     """Search for all keywords using the captured API requests."""
     # First convert the flow file to JSON
@@ -105,8 +151,9 @@ def search_all_keywords():
         logger.error("Failed to convert flow file to JSON")
         return
     
-    replayer = RequestReplayer()
-    captured_requests = []
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    rate_limiter = RateLimiter(REPLAY_RATE_PER_SEC, REPLAY_MIN_RATE_PER_SEC)
+    replayer = RequestReplayer(CAPTURE_FILE, rate_limiter=rate_limiter)
 
     try:
         captured = replayer.load_captured_requests()
@@ -119,60 +166,72 @@ def search_all_keywords():
             logger.error("No request body found in captured request")
             return
 
-        # First, save the initial "苹果" search result
+        # First, save the initial search result
         try:
-            with open(f"search_results_苹果.json", "w", encoding="utf-8") as f:
-                json.dump(original_request, f, ensure_ascii=False, indent=2)
+            initial_path = os.path.join(RESULTS_DIR, f"search_results_{INITIAL_KEYWORD}.json")
+            digest = request_digest(original_request)
+            if not is_cached(initial_path, digest):
+                atomic_write_bytes(initial_path, orjson.dumps(original_request, option=JSON_DUMP_OPTIONS))
+                mark_cached(initial_path, digest)
         except Exception as e:
-            logger.error(f"Failed to save initial search result: {str(e)}")
+            logger.error("Failed to save initial search result: %s", e)
             return
 
-        for keyword in SEARCH_KEYWORDS:
-            if keyword == "苹果":
-                continue
-
-            logger.info(f"Searching for: {keyword}")
-
-            try:
-                # Create a copy of the original request to modify
-                current_request = original_request.copy()
-                
-                # Parse and modify the body
-                try:
-                    body_dict = json.loads(current_request["body"])
-                    body_dict["keywords"] = keyword
-                    current_request["body"] = json.dumps(body_dict, ensure_ascii=False)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Could not parse request body as JSON: {str(e)}")
-                    continue
-
-                # Store the modified request
-                captured_requests.append(current_request)
-
-                # Replay the request
-                result = replayer.replay_request(current_request)
-                if result:
-                    with open(f"search_results_{keyword}.json", "w", encoding="utf-8") as f:
-                        json.dump(result, f, ensure_ascii=False, indent=2)
-                else:
-                    logger.error(f"Failed to get results for keyword: {keyword}")
-
-                time.sleep(0.5)  # 500ms delay between API calls
+        # Parse the body once; only the keywords field changes per search
+        try:
+            body_template = orjson.loads(original_request["body"])
+        except orjson.JSONDecodeError as e:
+            logger.error("Could not parse request body as JSON: %s", e)
+            return
 
-            except Exception as e:
-                logger.error(f"Error processing keyword {keyword}: {str(e)}")
-                continue
+        # Everything but the body is shared by all keyword requests
+        request_base = {k: v for k, v in original_request.items() if k != "body"}
+        build_body = make_body_builder(body_template)
+
+        # Build every keyword request up front so they can be replayed concurrently,
+        # recording each one to the capture file as it is built
+        keyword_requests = []
+        with atomic_writer(CAPTURE_FILE, buffering=WRITE_BUFFER_SIZE) as out:
+            for keyword in KEYWORDS_TO_SEARCH:
+                current_request = request_base | {"body": build_body(keyword)}
+                out.write(orjson.dumps(current_request))
+                out.write(b"\n")
+
+                # Skip keywords whose results were saved for this exact request
+                digest = request_digest(current_request)
+                out_path = os.path.join(RESULTS_DIR, f"search_results_{keyword}.json")
+                if is_cached(out_path, digest):
+                    logger.info("Using cached results for: %s", keyword)
+                    continue
+                keyword_requests.append((keyword, out_path, current_request, digest))
 
-        # Save all captured requests
+        # Workers only fetch and encode; a single thread does all file writes
+        results = queue.Queue()
+        writer = threading.Thread(target=result_writer, args=(results,), daemon=True)
+        writer.start()
         try:
-            with open("captured_requests.json", "w", encoding="utf-8") as f:
-                json.dump(captured_requests, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save captured requests: {str(e)}")
+            with ThreadPoolExecutor(max_workers=REPLAY_MAX_WORKERS) as executor:
+                futures = {
+                    executor.submit(search_keyword, replayer, keyword, out_path, request, digest, results): keyword
+                    for keyword, out_path, request, digest in keyword_requests
+                }
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error("Error processing keyword %s: %s", futures[future], e)
+        finally:
+            results.put(None)
+            writer.join()
 
     except Exception as e:
-        logger.error(f"Error in search_all_keywords: {str(e)}")
+        logger.error("Error in search_all_keywords: %s", e)
 
 
 if __name__ == "__main__":
+    # Set up logging; export LOG_LEVEL=DEBUG for per-flow details
+    logging.basicConfig(
+        level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
     search_all_keywords()
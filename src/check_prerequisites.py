@@ -5,13 +5,21 @@ This script verifies all required components are properly set up.
 
 import os
 import sys
+import json
+import functools
+import re
 import subprocess
 import logging
 import time
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 import requests
 import psutil
 import socket
+import select
+import errno
 import shutil
 from pathlib import Path
 
@@ -21,14 +29,96 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Runs of separators that PEP 503 treats as equivalent in package names
+PACKAGE_NAME_SEPARATORS = re.compile(r'[-_.]+')
+
+# Prints {normalized distribution name: version} for the running interpreter
+LIST_INSTALLED_PACKAGES = (
+    "import importlib.metadata, json, re; "
+    "print(json.dumps({re.sub(r'[-_.]+', '-', d.metadata['Name'] or '').lower(): d.version "
+    "for d in importlib.metadata.distributions()}))"
+)
+
+# connect_ex results meaning a non-blocking connect is still in progress
+CONNECT_IN_PROGRESS = {
+    errno.EINPROGRESS,
+    errno.EWOULDBLOCK,
+    errno.EALREADY,
+    getattr(errno, 'WSAEWOULDBLOCK', errno.EWOULDBLOCK),
+}
+
+def normalize_package_name(name):
+    """Normalize a distribution name as described in PEP 503"""
+    return PACKAGE_NAME_SEPARATORS.sub('-', name).lower()
+
+def link_or_copy(src, dst):
+    """Make dst refer to src with a hard link, falling back to a symlink and then a copy"""
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    try:
+        # Windows only allows this with SeCreateSymbolicLinkPrivilege
+        os.symlink(src, dst)
+        return
+    except OSError:
+        pass
+    shutil.copy2(src, dst)
+
+@functools.lru_cache(maxsize=1)
+def find_system_node():
+    """Find system Node.js installation; the result is cached for the process"""
+    possible_paths = [
+        os.path.join(os.environ.get('APPDATA', ''), '..', 'Local', 'Programs', 'node'),  # User install
+        os.path.join(os.environ.get('ProgramFiles', ''), 'nodejs'),  # System install x64
+        os.path.join(os.environ.get('ProgramFiles(x86)', ''), 'nodejs'),  # System install x86
+        os.path.join(os.environ.get('APPDATA', ''), 'npm'),  # NPM global
+    ]
+
+    for base_path in possible_paths:
+        node_exe = os.path.join(base_path, 'node.exe')
+        npm_cmd = os.path.join(base_path, 'npm.cmd')
+        if os.path.exists(node_exe) and os.path.exists(npm_cmd):
+            return node_exe, npm_cmd
+
+    # Try to find in PATH without spawning `where`
+    node_path = shutil.which('node')
+    npm_path = shutil.which('npm')
+    if node_path and npm_path:
+        return node_path, npm_path
+
+    return None, None
+
+@functools.lru_cache(maxsize=None)
+def get_node_version(node_path='node'):
+    """Return the `node --version` output for node_path, or None if it can't run"""
+    try:
+        result = subprocess.run(
+            [node_path, '--version'],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        return result.stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
 class PrerequisitesChecker:
     def __init__(self) -> None:
         self.all_checks_passed = True
+        self._lock = threading.Lock()
         self.required_packages: Dict[str, str | None] = {
             'Appium-Python-Client': None,
             'requests': None,
             'selenium': None,
-            'mitmproxy': None
+            'mitmproxy': None,
+            'orjson': None,
+            'ijson': None,
+            'opencv-python': None,
+            'numpy': None
         }
         self.required_images = [
             os.path.join('assets', 'close_button.png'),
@@ -40,46 +130,192 @@ class PrerequisitesChecker:
             os.path.join('src', 'extract_products.py'),
             'requirements.txt'
         ]
+        self.project_root = Path(__file__).resolve().parent.parent
+        # Required files grouped by directory, so each directory is listed only once
+        wanted = defaultdict(list)
+        for file in (*self.required_files, *self.required_images):
+            directory, name = os.path.split(file)
+            wanted[directory].append((file, name))
+        self._required_by_dir = tuple(
+            (self.project_root / directory, tuple(files)) for directory, files in wanted.items()
+        )
         self.appium_process = None
         self.mitmproxy_process = None
+        # Shared by all HTTP probes so polling reuses one connection pool
+        self._http = requests.Session()
         self.venv_path = ''
+        self.venv_scripts = ''
         self.venv_python = ''
         self.venv_pip = ''
+        self.venv_node = ''
+        self.venv_npm = ''
+        self.venv_appium = ''
+        self.venv_mitmdump = ''
 
     def _is_port_in_use(self, port):
         """Check if a port is in use"""
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
             return s.connect_ex(('localhost', port)) == 0
 
+    def _mark_failed(self):
+        """Record that a check failed; safe to call from worker threads"""
+        with self._lock:
+            self.all_checks_passed = False
+
+    def _wait_ready(self, check_fn, timeout=10, interval=0.1):
+        """Call check_fn every interval seconds until it returns True or timeout expires"""
+        deadline = time.monotonic() + timeout
+        while True:
+            if check_fn():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+
+    def _appium_ready(self):
+        """Check whether the Appium server answers its status endpoint"""
+        try:
+            return self._http.get('http://localhost:4723/status', timeout=0.2).status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    def _wait_for_port(self, port, hosts=('127.0.0.1',), timeout=30, interval=0.1, alive=None):
+        """Wait until a TCP connection to port succeeds on any of the hosts.
+
+        Keeps one non-blocking connect in flight per host and waits on them
+        together with select; a socket is only replaced once its connect has
+        failed, as reported through either the write or the except set.
+        Returns the host that accepted, or None on timeout. If alive is
+        given, stops early and returns None as soon as it returns False.
+        """
+        deadline = time.monotonic() + timeout
+        pending = {}
+        try:
+            while True:
+                if alive is not None and not alive():
+                    return None
+                round_end = time.monotonic() + interval
+
+                # Start a connect for every host that has none in flight
+                for host in set(hosts) - set(pending.values()):
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    sock.setblocking(False)
+                    result = sock.connect_ex((host, port))
+                    if result == 0:
+                        sock.close()
+                        return host
+                    if result in CONNECT_IN_PROGRESS:
+                        pending[sock] = host
+                    else:
+                        sock.close()
+
+                if pending:
+                    wait = max(0, min(round_end, deadline) - time.monotonic())
+                    # Winsock reports a failed non-blocking connect only through
+                    # exceptfds, other platforms through a writable socket
+                    _, writable, failed = select.select([], list(pending), list(pending), wait)
+                    for sock in writable:
+                        if sock not in failed and sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                            return pending[sock]
+                    for sock in {*writable, *failed}:
+                        # The connect failed; drop it so the next round retries
+                        del pending[sock]
+                        sock.close()
+
+                if time.monotonic() >= deadline:
+                    return None
+                # Refused connections return immediately; don't spin until the next round
+                time.sleep(max(0, min(round_end, deadline) - time.monotonic()))
+        finally:
+            for sock in pending:
+                sock.close()
+
+    def _find_process_on_port(self, port):
+        """Return the process bound to the specified port, or None"""
+        try:
+            connections = psutil.net_connections(kind='inet')
+        except psutil.AccessDenied:
+            # The system-wide query needs elevated rights on some platforms
+            return self._find_process_on_port_by_netstat(port)
+
+        for conn in connections:
+            if conn.laddr and conn.laddr.port == port and conn.pid:
+                try:
+                    return psutil.Process(conn.pid)
+                except psutil.NoSuchProcess:
+                    pass
+        return None
+
+    def _find_process_on_port_by_netstat(self, port):
+        """Find the process on a port from a single `netstat -ano` listing"""
+        try:
+            output = subprocess.run(
+                ['netstat', '-ano', '-p', 'tcp'],
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+
+        # Rows look like: TCP  0.0.0.0:8080  0.0.0.0:0  LISTENING  1234
+        suffix = f':{port}'
+        for line in output.splitlines():
+            parts = line.split()
+            if len(parts) >= 4 and parts[0] == 'TCP' and parts[1].endswith(suffix) and parts[-1].isdigit():
+                try:
+                    return psutil.Process(int(parts[-1]))
+                except psutil.NoSuchProcess:
+                    pass
+        return None
+
+    def _kill_process(self, proc, port):
+        """Kill a process found holding the specified port"""
+        try:
+            name = proc.name()
+            proc.kill()
+            logger.info(f"Killed process {name} using port {port}")
+            return True
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+
     def _kill_process_on_port(self, port):
         """Kill any process running on the specified port"""
-        for proc in psutil.process_iter(['pid', 'name']):
-            try:
-                for conn in proc.connections('inet'):
-                    if conn.laddr.port == port:
-                        proc.kill()
-                        logger.info(f"Killed process {proc.name()} using port {port}")
-                        return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.Error):
-                pass
-        return False
+        proc = self._find_process_on_port(port)
+        if proc is None:
+            return False
+        return self._kill_process(proc, port)
+
+    def _is_mitmproxy(self, proc):
+        """Check whether proc is a mitmproxy instance"""
+        try:
+            return proc.name().lower().startswith(('mitmdump', 'mitmproxy', 'mitmweb'))
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
 
     def check_venv(self):
         """Check if virtual environment exists and is properly set up"""
         logger.info("Checking virtual environment...")
-        project_root = Path(__file__).parent.parent
+        project_root = self.project_root
+        venv_scripts = project_root / 'venv' / 'Scripts'
+        # Resolve every executable path once; the other checks read these attributes
         self.venv_path = str(project_root / 'venv')
-        self.venv_python = str(project_root / 'venv' / 'Scripts' / 'python.exe')
-        self.venv_pip = str(project_root / 'venv' / 'Scripts' / 'pip.exe')
+        self.venv_scripts = str(venv_scripts)
+        self.venv_python = str(venv_scripts / 'python.exe')
+        self.venv_pip = str(venv_scripts / 'pip.exe')
+        self.venv_node = str(venv_scripts / 'node.exe')
+        self.venv_npm = str(venv_scripts / 'npm.cmd')
+        self.venv_appium = str(venv_scripts / 'appium.cmd')
+        self.venv_mitmdump = str(venv_scripts / 'mitmdump.exe')
         
         if not os.path.exists(self.venv_path):
             logger.error("❌ Virtual environment not found")
-            self.all_checks_passed = False
+            self._mark_failed()
             return False
             
         if not os.path.exists(self.venv_python):
             logger.error("❌ Python not found in virtual environment")
-            self.all_checks_passed = False
+            self._mark_failed()
             return False
 
         logger.info("✅ Virtual environment exists")
@@ -95,7 +331,7 @@ class PrerequisitesChecker:
         elif cmd == 'pip':
             cmd_path = self.venv_pip
         else:
-            cmd_path = os.path.join(self.venv_path, 'Scripts', cmd)
+            cmd_path = os.path.join(self.venv_scripts, cmd)
 
         try:
             result = subprocess.run(
@@ -114,6 +350,12 @@ class PrerequisitesChecker:
         """Start the Appium server."""
         logger.info("Starting Appium server...")
         try:
+            # Reuse a server that is already up, e.g. one left running by a
+            # previous check_prerequisites run; cleanup() leaves it alone
+            if self._appium_ready():
+                logger.info("✅ Appium server already running, reusing it")
+                return True
+
             # Kill any existing process using port 4723
             self._kill_process_on_port(4723)
             
@@ -128,17 +370,10 @@ class PrerequisitesChecker:
                 creationflags=subprocess.CREATE_NO_WINDOW
             )
             
-            # Wait for server to start
-            time.sleep(5)
-            
-            # Check if server started successfully
-            try:
-                response = requests.get('http://localhost:4723/status')
-                if response.status_code == 200:
-                    logger.info("✅ Appium server started successfully")
-                    return True
-            except requests.exceptions.ConnectionError:
-                pass
+            # Poll the status endpoint until the server answers
+            if self._wait_ready(self._appium_ready, timeout=10):
+                logger.info("✅ Appium server started successfully")
+                return True
             
             logger.error("❌ Failed to connect to Appium server")
             return False
@@ -151,8 +386,14 @@ class PrerequisitesChecker:
         """Start mitmproxy in regular mode"""
         logger.info("Starting mitmproxy...")
         try:
-            # First, kill any existing mitmproxy processes
-            self._kill_process_on_port(8080)
+            # Look up the port's owner once: reuse it if it is a mitmproxy
+            # (cleanup() only stops one this checker started), otherwise kill it
+            proc = self._find_process_on_port(8080)
+            if proc is not None:
+                if self._is_mitmproxy(proc):
+                    logger.info("✅ Mitmproxy already running on port 8080, reusing it")
+                    return True
+                self._kill_process(proc, 8080)
             
             # If we have a previous mitmproxy process, clean it up
             if self.mitmproxy_process:
@@ -166,9 +407,6 @@ class PrerequisitesChecker:
                         pass
                 self.mitmproxy_process = None
             
-            # Start mitmproxy with configuration for emulator
-            mitmdump_path = os.path.join(self.venv_path, 'Scripts', 'mitmdump.exe')
-            
             # Start mitmproxy in a new console window
             startupinfo = subprocess.STARTUPINFO()
             startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
@@ -176,48 +414,34 @@ class PrerequisitesChecker:
             
             self.mitmproxy_process = subprocess.Popen(
                 [
-                    mitmdump_path,
+                    self.venv_mitmdump,
                     "--listen-host", "0.0.0.0",  # Listen on all interfaces
                     "--listen-port", "8080",     # Use port 8080
                     "-w", "traffic.flow",        # Write output to traffic.flow
                     "--ssl-insecure",           # Allow SSL inspection
-                    "--set", "block_global=false"  # Don't block any traffic
+                    "--set", "block_global=false",  # Don't block any traffic
+                    "--set", "upstream_cert=false"  # Don't sniff certificates from upstream servers
                 ],
                 startupinfo=startupinfo,
                 creationflags=subprocess.CREATE_NEW_CONSOLE  # Create a new console window
             )
             
-            # Wait for mitmproxy to start
-            startup_wait = 5
-            time.sleep(startup_wait)
-            
-            # Check if process is still running
+            # Wait for the port to accept connections, giving up early if the process exits
+            # mitmproxy listens on 0.0.0.0, so loopback is enough to see it;
+            # 0.0.0.0 is not a valid address to connect to
+            host = self._wait_for_port(
+                8080,
+                timeout=30,
+                alive=lambda: self.mitmproxy_process.poll() is None
+            )
+            if host:
+                logger.info(f"✅ Mitmproxy started successfully and listening on {host}:8080")
+                return True
+
             if self.mitmproxy_process.poll() is not None:
                 logger.error("❌ Mitmproxy process failed to start")
                 return False
             
-            # Now check if port is accessible
-            max_retries = 30
-            retry_interval = 1
-            
-            for i in range(max_retries):
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                try:
-                    # Check both localhost and 0.0.0.0
-                    for host in ['127.0.0.1', '0.0.0.0']:
-                        result = sock.connect_ex((host, 8080))
-                        if result == 0:
-                            logger.info(f"✅ Mitmproxy started successfully and listening on {host}:8080")
-                            sock.close()
-                            return True
-                except socket.error:
-                    pass
-                finally:
-                    sock.close()
-                    
-                if i < max_retries - 1:  # Don't sleep on the last iteration
-                    time.sleep(retry_interval)
-            
             logger.error("❌ Failed to start mitmproxy")
             return False
             
@@ -225,14 +449,22 @@ class PrerequisitesChecker:
             logger.error(f"❌ Failed to start mitmproxy: {str(e)}")
             return False
 
-    def prepare_for_pagoda(self):
-        """Prepare all services for pagoda.py"""
+    def prepare_for_pagoda(self, on_checks_passed=None):
+        """Prepare all services for pagoda.py
+
+        on_checks_passed, if given, is called once the checks succeed and
+        before the services start, so the caller can overlap device work
+        that needs neither Appium nor the proxy with their startup.
+        """
         logger.info("\nPreparing environment for pagoda.py...")
         
         # Run all checks first
         if not self.run_all_checks():
             logger.error("❌ Prerequisites check failed. Please fix the issues before running pagoda.py")
             return False
+
+        if on_checks_passed is not None:
+            on_checks_passed()
             
         # Start required services
         if not self.start_appium_server():
@@ -250,7 +482,7 @@ class PrerequisitesChecker:
         version = sys.version_info
         if version.major < 3:
             logger.error(f"❌ Python version {version.major}.{version.minor} detected. Python 3.x is required.")
-            self.all_checks_passed = False
+            self._mark_failed()
         else:
             logger.info(f"✅ Python version {version.major}.{version.minor} detected.")
         return version.major >= 3
@@ -266,24 +498,17 @@ class PrerequisitesChecker:
         # Create a working copy of required packages
         required_packages: Dict[str, str | None] = dict(self.required_packages)
         
-        # Get list of installed packages
+        # Ask the venv interpreter for its installed distributions directly,
+        # which avoids starting pip and parsing its table output
         result = subprocess.run(
-            [os.path.join(self.venv_path, 'Scripts', 'pip'), 'list'],
+            [self.venv_python, '-c', LIST_INSTALLED_PACKAGES],
             capture_output=True,
             text=True,
             check=True
         )
-        
-        # Parse installed packages
-        for line in result.stdout.split('\n')[2:]:  # Skip header lines
-            if not line:
-                continue
-            parts = line.split()
-            if len(parts) < 2:
-                continue
-            package, version = parts[:2]
-            if package in required_packages:
-                required_packages[package] = version
+        installed = json.loads(result.stdout)
+        for package in required_packages:
+            required_packages[package] = installed.get(normalize_package_name(package))
         
         # Check each required package
         all_installed = True
@@ -298,30 +523,35 @@ class PrerequisitesChecker:
                 try:
                     logger.info(f"Installing {package}...")
                     subprocess.run(
-                        [os.path.join(self.venv_path, 'Scripts', 'pip'), 'install', package],
+                        [self.venv_pip, 'install', package],
                         check=True,
                         capture_output=True
                     )
                     logger.info(f"✅ Successfully installed {package}")
                 except subprocess.CalledProcessError as e:
                     logger.error(f"❌ Failed to install {package}: {e.stderr.decode()}")
-                    self.all_checks_passed = False
+                    self._mark_failed()
         
         return all_installed
 
     def check_required_files(self):
         """Check if all required files exist"""
         logger.info("Checking required files...")
-        project_root = Path(__file__).parent.parent
         all_files_exist = True
-        for file in self.required_files + self.required_images:
-            file_path = project_root / file
-            if not file_path.exists():
-                logger.error(f"❌ Required file {file} is missing.")
-                all_files_exist = False
-                self.all_checks_passed = False
-            else:
-                logger.info(f"✅ File {file} exists.")
+        for directory, files in self._required_by_dir:
+            try:
+                with os.scandir(directory) as entries:
+                    present = {entry.name for entry in entries}
+            except FileNotFoundError:
+                present = set()
+
+            for file, name in files:
+                if name not in present:
+                    logger.error(f"❌ Required file {file} is missing.")
+                    all_files_exist = False
+                    self._mark_failed()
+                else:
+                    logger.info(f"✅ File {file} exists.")
         return all_files_exist
 
     def check_adb_connection(self):
@@ -339,76 +569,39 @@ class PrerequisitesChecker:
                 return True
             else:
                 logger.error("❌ Failed to connect to emulator via ADB.")
-                self.all_checks_passed = False
+                self._mark_failed()
                 return False
         except subprocess.CalledProcessError:
             logger.error("❌ ADB command failed. Make sure Android SDK is installed and ADB is in PATH.")
-            self.all_checks_passed = False
+            self._mark_failed()
             return False
         except FileNotFoundError:
             logger.error("❌ ADB command not found. Make sure Android SDK is installed and ADB is in PATH.")
-            self.all_checks_passed = False
+            self._mark_failed()
             return False
 
-    def find_system_node(self):
-        """Find system Node.js installation"""
-        possible_paths = [
-            os.path.join(os.environ.get('APPDATA', ''), '..', 'Local', 'Programs', 'node'),  # User install
-            os.path.join(os.environ.get('ProgramFiles', ''), 'nodejs'),  # System install x64
-            os.path.join(os.environ.get('ProgramFiles(x86)', ''), 'nodejs'),  # System install x86
-            os.path.join(os.environ.get('APPDATA', ''), 'npm'),  # NPM global
-        ]
-
-        for base_path in possible_paths:
-            node_exe = os.path.join(base_path, 'node.exe')
-            npm_cmd = os.path.join(base_path, 'npm.cmd')
-            if os.path.exists(node_exe) and os.path.exists(npm_cmd):
-                return node_exe, npm_cmd
-
-        # Try to find in PATH
-        try:
-            result = subprocess.run(['where', 'node'], capture_output=True, text=True, check=True)
-            node_path = result.stdout.strip().split('\n')[0]
-            result = subprocess.run(['where', 'npm'], capture_output=True, text=True, check=True)
-            npm_path = result.stdout.strip().split('\n')[0]
-            if os.path.exists(node_path) and os.path.exists(npm_path):
-                return node_path, npm_path
-        except subprocess.CalledProcessError:
-            pass
-
-        return None, None
-
     def install_node_in_venv(self):
         """Install Node.js in virtual environment"""
         logger.info("Installing Node.js in virtual environment...")
         
         # First check if system Node.js is available
-        try:
-            result = subprocess.run(
-                ['node', '--version'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            system_node_version = result.stdout.strip()
-            logger.info(f"Found system Node.js {system_node_version}")
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        system_node_version = get_node_version()
+        if system_node_version is None:
             logger.error("❌ System Node.js not found. Please install Node.js from https://nodejs.org/")
             return False
+        logger.info(f"Found system Node.js {system_node_version}")
 
         # Find Node.js installation
-        system_node, system_npm = self.find_system_node()
+        system_node, system_npm = find_system_node()
         if not system_node or not system_npm:
             logger.error("❌ Could not find system Node.js installation files")
             return False
 
-        venv_node = os.path.join(self.venv_path, 'Scripts', 'node.exe')
-        venv_npm = os.path.join(self.venv_path, 'Scripts', 'npm.cmd')
         venv_node_modules = os.path.join(self.venv_path, 'node_modules')
 
         try:
-            # Copy Node.js executable
-            shutil.copy2(system_node, venv_node)
+            # Link Node.js executable rather than copying it
+            link_or_copy(system_node, self.venv_node)
             
             # Create npm.cmd in Scripts directory that uses system npm with modified prefix
             npm_cmd_content = f'''@ECHO off
@@ -419,7 +612,7 @@ ENDLOCAL
 EXIT /b %errorlevel%
 '''
             
-            with open(venv_npm, 'w') as f:
+            with open(self.venv_npm, 'w') as f:
                 f.write(npm_cmd_content)
             
             # Create node_modules directory
@@ -435,18 +628,19 @@ EXIT /b %errorlevel%
         """Install Appium and required plugins in virtual environment."""
         try:
             logger.info("Installing Appium and plugins...")
-            npm_path = os.path.join(self.venv_path, 'Scripts', 'npm.cmd')
-            appium_path = os.path.join(self.venv_path, 'Scripts', 'appium.cmd')
-            
-            # Install Appium
-            subprocess.run([npm_path, "install", "-g", "appium"], check=True)
-            
-            # Install OpenCV for image plugin
-            subprocess.run([npm_path, "install", "-g", "@appium/opencv"], check=True)
-            
-            # Install and configure image plugin
-            subprocess.run([appium_path, "plugin", "install", "images"], check=True)
-            subprocess.run([appium_path, "plugin", "list", "--installed"], check=True)
+            npm_path = self.venv_npm
+            appium_path = self.venv_appium
+
+            # Install Appium, OpenCV for the image plugin, then the image plugin
+            # itself in one shell; && stops at the first failing step
+            script = ' && '.join([
+                f'"{npm_path}" install -g appium',
+                f'"{npm_path}" install -g @appium/opencv',
+                f'"{appium_path}" plugin install images',
+                f'"{appium_path}" plugin list --installed',
+            ])
+            # Passed as a string with /s so cmd strips only the outer quotes
+            subprocess.run(f'cmd.exe /s /c "{script}"', check=True)
             
             logger.info("✅ Appium and plugins installed successfully")
             return True
@@ -472,26 +666,20 @@ EXIT /b %errorlevel%
     def check_node_installation(self):
         """Check if Node.js is installed in virtual environment"""
         logger.info("Checking Node.js installation in virtual environment...")
-        node_path = os.path.join(self.venv_path, 'Scripts', 'node.exe')
-        npm_path = os.path.join(self.venv_path, 'Scripts', 'npm.cmd')
+        node_path = self.venv_node
+        npm_path = self.venv_npm
         
         if not os.path.exists(node_path) or not os.path.exists(npm_path):
             logger.info("Node.js not found in virtual environment, attempting to install...")
             return self.install_node_in_venv()
 
-        try:
-            result = subprocess.run(
-                [node_path, '--version'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            logger.info(f"✅ Node.js {result.stdout.strip()} is installed in virtual environment")
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        node_version = get_node_version(node_path)
+        if node_version is None:
             logger.error("❌ Node.js check failed in virtual environment")
-            self.all_checks_passed = False
+            self._mark_failed()
             return False
+        logger.info(f"✅ Node.js {node_version} is installed in virtual environment")
+        return True
 
     def check_appium_server(self):
         """Check if Appium server is installed and running"""
@@ -502,7 +690,7 @@ EXIT /b %errorlevel%
             return False
         
         # Then check Appium installation
-        appium_path = os.path.join(self.venv_path, 'Scripts', 'appium.cmd')
+        appium_path = self.venv_appium
         
         if not os.path.exists(appium_path):
             logger.info("Appium not found in virtual environment, attempting to install...")
@@ -566,27 +754,32 @@ EXIT /b %errorlevel%
                 return True
             else:
                 logger.error("❌ Pagoda app is not installed on the emulator.")
-                self.all_checks_passed = False
+                self._mark_failed()
                 return False
         except (subprocess.CalledProcessError, FileNotFoundError):
             logger.error("❌ Could not check Pagoda app installation. Make sure ADB is working.")
-            self.all_checks_passed = False
+            self._mark_failed()
             return False
 
     def run_all_checks(self):
         """Run all prerequisite checks"""
         logger.info("Starting prerequisites check...")
         
+        # The other checks rely on the venv paths resolved here
+        self.check_venv()
+
+        # The rest are independent and mostly wait on subprocesses or I/O,
+        # so run them concurrently. The app check needs ADB connected first.
         checks = [
-            self.check_venv(),
-            self.check_python_version(),
-            self.check_python_packages(),
-            self.check_required_files(),
-            self.check_adb_connection(),
-            self.check_appium_installation(),
-            self.check_mitmproxy(),
-            self.check_pagoda_app()
+            self.check_python_version,
+            self.check_python_packages,
+            self.check_required_files,
+            lambda: self.check_adb_connection() and self.check_pagoda_app(),
+            self.check_appium_installation,
+            self.check_mitmproxy,
         ]
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(lambda check: check(), checks))
 
         logger.info("\nPrerequisites Check Summary:")
         logger.info("=" * 50)
@@ -598,7 +791,8 @@ EXIT /b %errorlevel%
         return self.all_checks_passed
 
     def cleanup(self):
-        """Cleanup resources"""
+        """Cleanup resources; only stops the services this checker started"""
+        self._http.close()
         if self.appium_process:
             logger.info("Stopping Appium server...")
             self.appium_process.terminate()
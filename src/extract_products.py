@@ -1,39 +1,56 @@
 import glob
-import json
+import os
+import sys
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
+import ijson
+import orjson
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from config.config import RESULTS_DIR
 
-def extract_all_products(output_file="products.json"):
-    try:
-        products = defaultdict(list)
-        existing_items = set()
 
-        # Process all search result files
-        for result_file in glob.glob("search_results_*.json"):
-            keyword = result_file.replace("search_results_", "").replace(".json", "")
+def _extract_one(result_file):
+    """Extract (goodsName, memberPrice) pairs from one search result file."""
+    keyword = os.path.basename(result_file)[len("search_results_"):-len(".json")]
+    file_items = []
 
-            with open(result_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+    # Stream only the onSaleList entries instead of loading the whole response;
+    # files without data.b2c.onSaleList simply yield nothing
+    with open(result_file, "rb") as f:
+        for item in ijson.items(f, "data.b2c.onSaleList.item", use_float=True):
+            name = item.get("goodsName")
+            member_price = item.get("memberPrice")
+            if name is None or member_price is None:
+                continue
+            file_items.append((name, member_price))
 
-            if (
-                "data" in data
-                and "b2c" in data["data"]
-                and "onSaleList" in data["data"]["b2c"]
-            ):
+    return keyword, file_items
 
-                for item in data["data"]["b2c"]["onSaleList"]:
-                    product = {
-                        "item": item["goodsName"],
-                        "price": item["memberPrice"] / 100,
-                    }
 
-                    item_key = f"{product['item']}_{product['price']}"
+def extract_all_products(output_file="products.json"):
+    try:
+        products = defaultdict(list)
+        existing_items = set()
+
+        # Parse result files in parallel; deduplicate in order on this process
+        result_files = glob.glob(os.path.join(RESULTS_DIR, "search_results_*.json"))
+        with ProcessPoolExecutor() as executor:
+            for keyword, file_items in executor.map(_extract_one, result_files):
+                for item_key in file_items:
+                    # Key on the raw price in cents, before any float division
                     if item_key not in existing_items:
-                        products[keyword].append(product)
                         existing_items.add(item_key)
+                        name, member_price = item_key
+                        products[keyword].append({"item": name, "price": member_price / 100})
 
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(products, f, ensure_ascii=False, indent=2)
+        with open(output_file, "wb") as f:
+            f.write(orjson.dumps(dict(products), option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
 
         print(f"Successfully extracted products for {len(products)} keywords")
 
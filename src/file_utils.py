@@ -0,0 +1,32 @@
+"""Helpers for writing output files without leaving them half-written."""
+
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_writer(path, fsync=True, buffering=-1):
+    """Open a temporary file for binary writing and move it over path on success.
+
+    If the block raises, the temporary file is removed and path is left untouched.
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb", buffering=buffering) as f:
+            yield f
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_bytes(path, data, fsync=True):
+    """Atomically replace path with data."""
+    with atomic_writer(path, fsync=fsync) as f:
+        f.write(data)
@@ -3,10 +3,16 @@
 import os
 import sys
 import time
+import base64
+import hashlib
 import json
 import logging
+import threading
 import subprocess
 from pathlib import Path
+import cv2
+import numpy as np
+import requests
 from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
 from appium.webdriver.common.appiumby import AppiumBy
 from selenium.webdriver.support.ui import WebDriverWait
@@ -21,6 +27,24 @@ sys.path.append(str(project_root))
 
 from config.config import *
 
+# Set up logging once per process rather than per PagodaSearch instance
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    handler = logging.FileHandler(LOGS_DIR / "automation.log")
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+# Set up HTTP request logging
+http_logger = logging.getLogger("http_requests")
+if not http_logger.handlers:
+    http_handler = logging.FileHandler(LOGS_DIR / "requests.log")
+    http_formatter = logging.Formatter("%(asctime)s - %(message)s")
+    http_handler.setFormatter(http_formatter)
+    http_logger.addHandler(http_handler)
+    http_logger.setLevel(logging.INFO)
+
 class NavigationError(Exception):
     """Raised when navigation fails in the Pagoda app."""
     pass
@@ -29,58 +53,268 @@ class PagodaAPIError(Exception):
     """Raised when API requests fail in the Pagoda app."""
     pass
 
+class ImageMatch:
+    """A template match on the screen that can be clicked like an element."""
+
+    def __init__(self, search, x, y, width, height, score):
+        self._search = search
+        # Plain ints, since numpy scalars don't serialize into driver commands
+        self.location = {'x': int(x), 'y': int(y)}
+        self.size = {'width': int(width), 'height': int(height)}
+        self.score = float(score)
+
+    @property
+    def rect(self):
+        return {**self.location, **self.size}
+
+    def click(self):
+        """Tap the centre of the match; the screen is expected to change."""
+        x = self.location['x'] + self.size['width'] // 2
+        y = self.location['y'] + self.size['height'] // 2
+        self._search.driver.tap([(x, y)])
+        self._search._invalidate_screenshot()
+
 class PagodaSearch:
     """A class to handle product searches in the Pagoda mobile application using Appium automation."""
 
     def __init__(self, driver: RemoteWebDriver = None):
         """Initialize the PagodaSearch class with configuration."""
         self.driver = driver
-        self.logger = logging.getLogger(__name__)
-        
-        # Set up logging
-        if not self.logger.handlers:
-            handler = logging.FileHandler(LOGS_DIR / "automation.log")
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
-            self.logger.setLevel(logging.INFO)
-
-        # Set up HTTP request logging
-        self.http_logger = logging.getLogger("http_requests")
-        if not self.http_logger.handlers:
-            http_handler = logging.FileHandler(LOGS_DIR / "requests.log")
-            http_formatter = logging.Formatter("%(asctime)s - %(message)s")
-            http_handler.setFormatter(http_formatter)
-            self.http_logger.addHandler(http_handler)
-            self.http_logger.setLevel(logging.INFO)
+        self.logger = logger
+        self.http_logger = http_logger
 
-    def find_element_by_image(self, image_path, timeout=10, threshold=None):
-        """Find a single element by image matching."""
+        # Resolved template paths and their base64 contents, filled on first use
+        self._asset_cache: dict[str, str | None] = {}
+        self._asset_b64: dict[str, str] = {}
+        # Grayscale template pyramids (full size first) for client-side matching
+        self._pyramids: dict[str, list[np.ndarray]] = {}
+
+        # Where the app is known to be, and when popups were last dealt with,
+        # so repeated searches can skip navigation they don't need
+        self._nav_state = None
+        self._popups_dismissed_at = float('-inf')
+
+        # Screen stream from the UiAutomator2 MJPEG server, set once a session enables it
+        self._mjpeg_url = None
+
+        # Background UiAutomator2 reset started by clear_uiautomator2_async
+        self._clear_thread = None
+
+        # Last grayscale screenshot and its pyramid, shared by finders called back to back
+        self._frame = None
+        self._frame_levels = None
+        self._frame_at = 0.0
+
+    def _resolve_asset(self, image_path):
+        """Return the absolute path of an image template, or None if it doesn't exist."""
+        try:
+            return self._asset_cache[image_path]
+        except KeyError:
+            pass
+        path = image_path if os.path.isabs(image_path) else str(ASSETS_DIR / image_path)
+        resolved = path if os.path.exists(path) else None
+        if resolved is None:
+            self.logger.error("Image file not found: %s", path)
+        else:
+            self._asset_cache[image_path] = resolved
+        return resolved
+
+    def _template_b64(self, path):
+        """Return the base64-encoded template at path, reading it only once."""
+        encoded = self._asset_b64.get(path)
+        if encoded is None:
+            with open(path, 'rb') as f:
+                encoded = base64.b64encode(f.read()).decode('ascii')
+            self._asset_b64[path] = encoded
+        return encoded
+
+    def _template_pyramid(self, path):
+        """Return the grayscale template pyramid for path, building it only once.
+
+        Levels stop early for small templates so the coarsest one still has
+        enough detail to match.
+        """
+        levels = self._pyramids.get(path)
+        if levels is None:
+            template = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if template is None:
+                raise ValueError(f"Could not decode image: {path}")
+            levels = [template]
+            while len(levels) <= IMAGE_PYRAMID_LEVELS and min(levels[-1].shape) // 2 >= MIN_TEMPLATE_SIDE:
+                levels.append(cv2.pyrDown(levels[-1]))
+            self._pyramids[path] = levels
+        return levels
+
+    def _read_mjpeg_frame(self):
+        """Return one JPEG frame from the MJPEG stream."""
+        with requests.get(self._mjpeg_url, stream=True, timeout=(1, 2)) as response:
+            response.raise_for_status()
+            buffer = b''
+            for chunk in response.iter_content(chunk_size=65536):
+                buffer += chunk
+                start = buffer.find(b'\xff\xd8')
+                if start != -1:
+                    end = buffer.find(b'\xff\xd9', start + 2)
+                    if end != -1:
+                        return buffer[start:end + 2]
+                if len(buffer) > MJPEG_MAX_FRAME_BYTES:
+                    break
+        raise ValueError("No complete JPEG frame in MJPEG stream")
+
+    def _capture_frame(self):
+        """Capture the screen in grayscale, preferring the MJPEG stream over a PNG screenshot."""
+        if self._mjpeg_url is not None:
+            try:
+                jpeg = self._read_mjpeg_frame()
+                frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_GRAYSCALE)
+                if frame is not None:
+                    return frame
+            except (requests.RequestException, ValueError) as e:
+                self.logger.info("MJPEG stream unavailable, falling back to screenshots: %s", e)
+            # Don't keep retrying a stream that isn't there
+            self._mjpeg_url = None
+        png = self.driver.get_screenshot_as_png()
+        return cv2.imdecode(np.frombuffer(png, np.uint8), cv2.IMREAD_GRAYSCALE)
+
+    def _screenshot_np(self):
+        """Return the current screen in grayscale, reusing a very recent capture."""
+        now = time.monotonic()
+        if self._frame is None or now - self._frame_at > SCREENSHOT_TTL:
+            self._frame = self._capture_frame()
+            self._frame_levels = None
+            self._frame_at = now
+        return self._frame
+
+    def _screenshot_pyramid(self):
+        """Return the cached screenshot's pyramid, or None if there is no screenshot."""
+        frame = self._screenshot_np()
+        if frame is None:
+            return None
+        if self._frame_levels is None:
+            levels = [frame]
+            for _ in range(IMAGE_PYRAMID_LEVELS):
+                levels.append(cv2.pyrDown(levels[-1]))
+            self._frame_levels = levels
+        return self._frame_levels
+
+    def _invalidate_screenshot(self):
+        """Drop the cached screenshot after an action that changes the screen."""
+        self._frame = None
+        self._frame_levels = None
+
+    def _best_match(self, frame, template):
+        """Return (score, (x, y)) of the best normalized match of template in frame."""
+        if frame.shape[0] < template.shape[0] or frame.shape[1] < template.shape[1]:
+            return -1.0, (0, 0)
+        result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, location = cv2.minMaxLoc(result)
+        return score, location
+
+    def _match_template(self, frame_levels, template_levels, threshold):
+        """Return (score, (x, y)) of the best match, searching coarse to fine.
+
+        The coarsest level is matched over the whole frame. Anything scoring
+        within COARSE_MATCH_RATIO of threshold becomes a candidate; nearby
+        candidates are merged and only those regions are matched again at
+        full resolution, best coarse score first, stopping at the first one
+        that reaches threshold.
+        """
+        frame, template = frame_levels[0], template_levels[0]
+        level = min(len(frame_levels), len(template_levels)) - 1
+        if level == 0:
+            return self._best_match(frame, template)
+
+        coarse_frame, coarse_template = frame_levels[level], template_levels[level]
+        if coarse_frame.shape[0] < coarse_template.shape[0] or coarse_frame.shape[1] < coarse_template.shape[1]:
+            return -1.0, (0, 0)
+        coarse = cv2.matchTemplate(coarse_frame, coarse_template, cv2.TM_CCOEFF_NORMED)
+        candidates = (coarse >= COARSE_MATCH_RATIO * threshold).astype(np.uint8)
+        if not candidates.any():
+            return float(coarse.max()), (0, 0)
+
+        # Join neighbouring hits into regions; a square kernel is the cheapest
+        candidates = cv2.morphologyEx(candidates, cv2.MORPH_CLOSE, np.ones((5, 5), np.uint8))
+        _, _, stats, _ = cv2.connectedComponentsWithStats(candidates)
+
+        # Refine the most promising regions first so a hit can end the search early
+        regions = sorted(
+            stats[1:, :4],
+            key=lambda box: coarse[box[1]:box[1] + box[3], box[0]:box[0] + box[2]].max(),
+            reverse=True
+        )
+
+        scale = 1 << level
+        height, width = template.shape
+        best = (-1.0, (0, 0))
+        for x, y, box_width, box_height in regions:
+            # Map the region back to full size, with a coarse pixel of slack on each side
+            x0 = max(0, (x - 1) * scale)
+            y0 = max(0, (y - 1) * scale)
+            x1 = min(frame.shape[1], (x + box_width + 1) * scale + width)
+            y1 = min(frame.shape[0], (y + box_height + 1) * scale + height)
+            score, (rx, ry) = self._best_match(frame[y0:y1, x0:x1], template)
+            if score > best[0]:
+                best = (score, (x0 + rx, y0 + ry))
+                if score >= threshold:
+                    break
+        return best
+
+    def _find_first_of(self, image_paths, timeout=10, threshold=None):
+        """Return (image_path, ImageMatch) for the first of several templates on screen.
+
+        Every template is checked against the same screenshot before a new
+        one is taken, so looking for N possible dialogs costs one capture
+        per attempt rather than N. Returns (None, None) if none turns up.
+        """
         try:
             if self.driver is None:
                 self.logger.error("WebDriver is not initialized. Please call start_automation() first.")
-                return None
-                
-            image_path = str(ASSETS_DIR / image_path)
-            if not os.path.exists(image_path):
-                self.logger.error(f"Image file not found: {image_path}")
-                return None
-            
+                return None, None
+
+            candidates = []
+            for image_path in image_paths:
+                resolved = self._resolve_asset(image_path)
+                if resolved is not None:
+                    candidates.append((image_path, resolved, self._template_pyramid(resolved)))
+            if not candidates:
+                return None, None
+            if threshold is None:
+                threshold = IMAGE_MATCH_THRESHOLD
+
             # Try to find element by image recognition
-            try:
-                self.logger.info(f"Attempting to find image: {image_path}")
-                element = WebDriverWait(self.driver, timeout).until(
-                    lambda x: x.find_element(AppiumBy.IMAGE, image_path)
-                )
-                self.logger.info("Image element found successfully")
-                return element
-            except Exception as e:
-                self.logger.debug(f"Image recognition failed: {str(e)}")
-                return None
+            for _, resolved, _ in candidates:
+                self.logger.info("Attempting to find image: %s", resolved)
+            deadline = time.monotonic() + timeout
+            while True:
+                frame_levels = self._screenshot_pyramid()
+                if frame_levels is not None:
+                    for image_path, resolved, template_levels in candidates:
+                        score, (x, y) = self._match_template(frame_levels, template_levels, threshold)
+                        if score >= threshold:
+                            self.logger.info("Image element found successfully")
+                            height, width = template_levels[0].shape
+                            return image_path, ImageMatch(self, x, y, width, height, score)
+                        self.logger.debug("Best match for %s scored %.3f", resolved, score)
+
+                if time.monotonic() >= deadline:
+                    return None, None
+                time.sleep(min(IMAGE_POLL_INTERVAL, max(0, deadline - time.monotonic())))
+                # The next attempt needs a fresh view of the screen
+                self._invalidate_screenshot()
 
         except Exception as e:
-            self.logger.error(f"Error finding image element: {str(e)}")
-            return None
+            self.logger.error("Error finding image element: %s", e)
+            return None, None
+
+    def find_element_by_image(self, image_path, timeout=10, threshold=None):
+        """Find a single element by image matching.
+
+        Matches the template against a screenshot on this side instead of
+        asking Appium to do it, so each attempt costs one screenshot. The
+        returned ImageMatch taps its centre when clicked.
+        """
+        _, element = self._find_first_of([image_path], timeout=timeout, threshold=threshold)
+        return element
 
     def find_elements_by_image(self, image_path, timeout=10, max_retries=1):
         """Find multiple elements by image matching with retry logic."""
@@ -91,20 +325,20 @@ class PagodaSearch:
                     self.logger.error("WebDriver is not initialized. Please call start_automation() first.")
                     return []
                     
-                image_path = str(ASSETS_DIR / image_path)
-                if not os.path.exists(image_path):
-                    self.logger.error(f"Image file not found: {image_path}")
+                resolved = self._resolve_asset(image_path)
+                if resolved is None:
                     return []
+                template = self._template_b64(resolved)
                     
-                elements = WebDriverWait(self.driver, timeout).until(
-                    lambda x: x.find_elements(AppiumBy.IMAGE, image_path)
+                elements = WebDriverWait(self.driver, timeout, poll_frequency=WAIT_POLL_FREQUENCY).until(
+                    lambda x: x.find_elements(AppiumBy.IMAGE, template)
                 )
                 if elements:
                     return elements
             except TimeoutException:
-                self.logger.info(f"No elements found for image: {image_path}")
+                self.logger.info("No elements found for image: %s", image_path)
             except Exception as e:
-                self.logger.error(f"Error finding elements: {str(e)}")
+                self.logger.error("Error finding elements: %s", e)
             
             retry_count += 1
             if retry_count < max_retries:
@@ -112,52 +346,83 @@ class PagodaSearch:
         
         return []
 
+    def _wait_stable(self, timeout=5, quiet_ms=500, interval=0.2):
+        """Wait until the page source stays unchanged for quiet_ms, or timeout expires.
+
+        Returns True if the UI settled, False if it was still changing at timeout.
+        """
+        deadline = time.monotonic() + timeout
+        last_digest = None
+        stable_since = time.monotonic()
+        while True:
+            digest = hashlib.blake2b(self.driver.page_source.encode('utf-8'), digest_size=16).digest()
+            now = time.monotonic()
+            if digest != last_digest:
+                last_digest = digest
+                stable_since = now
+            elif now - stable_since >= quiet_ms / 1000:
+                return True
+            if now >= deadline:
+                return False
+            time.sleep(interval)
+
     def handle_popups(self, max_attempts=1):
-        """Handle any popups that appear during automation."""
+        """Handle any popups that appear during automation.
+
+        Skipped if popups were already handled within POPUP_RECHECK_INTERVAL seconds.
+        """
+        if time.monotonic() - self._popups_dismissed_at < POPUP_RECHECK_INTERVAL:
+            return
         try:
-            close_button = self.find_element_by_image("close_button.png", timeout=2)
+            close_button = self.find_element_by_image(CLOSE_BUTTON_STR, timeout=2)
             if close_button:
                 self.logger.info("Found popup close button, clicking it")
                 close_button.click()
                 time.sleep(1)
+            self._popups_dismissed_at = time.monotonic()
         except Exception as e:
-            self.logger.debug(f"No popup found or error handling popup: {str(e)}")
+            self.logger.debug("No popup found or error handling popup: %s", e)
             pass
 
     def navigate_to_nationwide_delivery(self, max_attempts=3):
         """Navigate to the nationwide delivery section."""
         for attempt in range(max_attempts):
             try:
-                self.logger.info(f"Navigation attempt {attempt + 1}/{max_attempts}")
+                self.logger.info("Navigation attempt %d/%d", attempt + 1, max_attempts)
                 
                 # Wait for the bottom navigation to be visible first
                 try:
-                    # Wait for the immediate delivery icon to be visible
-                    WebDriverWait(self.driver, 10).until(
-                        lambda x: x.find_element(AppiumBy.XPATH, "//android.widget.TextView[@text='及时达']")
+                    # Wait for the immediate delivery icon to be visible; a UiSelector is
+                    # resolved natively instead of walking an XML dump like XPath
+                    WebDriverWait(self.driver, 10, poll_frequency=WAIT_POLL_FREQUENCY).until(
+                        EC.presence_of_element_located(
+                            (AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().className("android.widget.TextView").text("及时达")')
+                        )
                     )
                     self.logger.info("Bottom navigation is visible")
-                    time.sleep(2)  # Give a moment for the entire UI to stabilize
+                    self._wait_stable()  # Give the rest of the UI a moment to settle
                 except Exception as e:
-                    self.logger.warning(f"Bottom navigation not found: {str(e)}")
+                    self.logger.warning("Bottom navigation not found: %s", e)
                     continue
                 
                 # Now try finding the nationwide delivery icon
                 self.logger.info("Trying to find nationwide delivery by image...")
-                icon = self.find_element_by_image("nationwide_delivery_icon.png", timeout=5)
+                icon = self.find_element_by_image(NATIONWIDE_DELIVERY_STR, timeout=5)
                 if icon:
                     icon.click()
                     time.sleep(2)
+                    self._nav_state = "nationwide"
                     return True
                 
                 self.logger.warning("Nationwide delivery icon not found")
             except Exception as e:
-                self.logger.warning(f"Error navigating to nationwide delivery: {str(e)}")
+                self.logger.warning("Error navigating to nationwide delivery: %s", e)
             
             if attempt < max_attempts - 1:
                 time.sleep(2)
         
         self.logger.error("Failed to navigate to nationwide delivery after all attempts")
+        self._nav_state = None
         return False
 
     def search_products(self, search_term):
@@ -166,23 +431,27 @@ class PagodaSearch:
             # Handle any popups before searching
             self.handle_popups()
             
-            # Navigate to nationwide delivery section
-            if not self.navigate_to_nationwide_delivery():
+            # Navigate to nationwide delivery section, unless already there
+            if self._nav_state != "nationwide" and not self.navigate_to_nationwide_delivery():
                 raise NavigationError("Failed to navigate to nationwide delivery section")
             
             # Find and click search input
-            search_input = self.find_element_by_image("search_input.png", timeout=10)
+            search_input = self.find_element_by_image(SEARCH_INPUT_STR, timeout=10)
             if not search_input:
                 raise NavigationError("Search input not found")
                 
             search_input.click()
+            # The search page replaces the nationwide delivery section
+            self._nav_state = None
             time.sleep(2)
             
             # Enter search term
             if self.driver is None:
                 self.logger.error("Driver is not initialized. Please call _setup_driver first.")
                 return False
-            search_field = self.driver.find_element(AppiumBy.CLASS_NAME, "android.widget.EditText")
+            search_field = WebDriverWait(self.driver, ELEMENT_WAIT, poll_frequency=WAIT_POLL_FREQUENCY).until(
+                EC.presence_of_element_located((AppiumBy.CLASS_NAME, "android.widget.EditText"))
+            )
             search_field.clear()
             search_field.send_keys(search_term + '\n')  # Enter key
             time.sleep(1)
@@ -190,7 +459,7 @@ class PagodaSearch:
             return True
             
         except Exception as e:
-            self.logger.error(f"Error during product search: {str(e)}")
+            self.logger.error("Error during product search: %s", e)
             return False
 
     def start_automation(self):
@@ -210,16 +479,16 @@ class PagodaSearch:
             self.logger.info("Waiting for home page to load...")
             try:
                 # First wait for any TextView to appear
-                WebDriverWait(self.driver, 10).until(
-                    lambda x: len(x.find_elements(AppiumBy.CLASS_NAME, "android.widget.TextView")) > 0
+                WebDriverWait(self.driver, 10, poll_frequency=WAIT_POLL_FREQUENCY).until(
+                    EC.presence_of_all_elements_located((AppiumBy.CLASS_NAME, "android.widget.TextView"))
                 )
                 
-                # Then wait a bit longer for the page to fully render
-                time.sleep(5)  # Give more time for the home page to fully load
+                # Then wait until the page stops changing
+                self._wait_stable()
                 
                 self.logger.info("Home page is fully loaded")
             except Exception as e:
-                self.logger.error(f"Home page load failed: {str(e)}")
+                self.logger.error("Home page load failed: %s", e)
                 return False
             
             # Navigate to nationwide delivery
@@ -229,35 +498,39 @@ class PagodaSearch:
             return True
             
         except Exception as e:
-            self.logger.error(f"Error during automation: {str(e)}")
+            self.logger.error("Error during automation: %s", e)
             return False
 
     def handle_startup_dialogs(self):
         """Handle initial startup dialogs like agree and location selection."""
         try:
-            # Check for agree button with short timeout
-            agree_button = self.find_element_by_image("agree.png", timeout=2)
-            if agree_button:
-                self.logger.info("Found agree button, clicking it")
-                agree_button.click()
-                time.sleep(1)
-            
-            # Check for location selection with short timeout
-            location_button = self.find_element_by_image("select_location.png", timeout=2)
-            if location_button:
+            # Look for both dialogs in each screenshot and handle whichever shows up
+            pending = [AGREE_BUTTON_STR, SELECT_LOCATION_STR]
+            while pending:
+                found, button = self._find_first_of(pending, timeout=2)
+                if button is None:
+                    break
+                pending.remove(found)
+
+                if found == AGREE_BUTTON_STR:
+                    self.logger.info("Found agree button, clicking it")
+                    button.click()
+                    time.sleep(1)
+                    continue
+
                 self.logger.info("Found location selection button, clicking it")
-                location_button.click()
+                button.click()
                 time.sleep(1)
                 
                 # Select specific location
-                store_location = self.find_element_by_image("location.png", timeout=3)
+                store_location = self.find_element_by_image(LOCATION_BUTTON_STR, timeout=3)
                 if store_location:
                     self.logger.info("Found store location, clicking it")
                     store_location.click()
                     time.sleep(1)
                 
         except Exception as e:
-            self.logger.debug(f"No startup dialogs found or error handling them: {str(e)}")
+            self.logger.debug("No startup dialogs found or error handling them: %s", e)
             pass
 
         self.logger.info("Startup dialog handling complete")
@@ -265,24 +538,48 @@ class PagodaSearch:
     def verify_app_ready(self):
         """Verify that the app is ready for automation."""
         try:
-            WebDriverWait(self.driver, ELEMENT_WAIT).until(
-                lambda x: x.find_element(AppiumBy.CLASS_NAME, "android.widget.ImageView")
+            WebDriverWait(self.driver, ELEMENT_WAIT, poll_frequency=WAIT_POLL_FREQUENCY).until(
+                EC.presence_of_element_located((AppiumBy.CLASS_NAME, "android.widget.ImageView"))
             )
             self.logger.info("App UI elements verified")
             return True
         except Exception as e:
-            self.logger.warning(f"Could not verify app UI elements: {str(e)}")
+            self.logger.warning("Could not verify app UI elements: %s", e)
             return False
 
-    def _setup_driver(self):
-        """Set up and configure the Appium WebDriver."""
-        # Clear UiAutomator2 server data
+    def clear_uiautomator2_async(self):
+        """Start clearing the UiAutomator2 server data on a background thread.
+
+        This only needs adb, so it can run while the Appium server and the
+        proxy are still starting; _setup_driver waits for it.
+        """
+        self._clear_thread = threading.Thread(
+            target=self._clear_uiautomator2_server, name="uiautomator2-clear", daemon=True
+        )
+        self._clear_thread.start()
+
+    def _clear_uiautomator2_server(self):
+        """Clear UiAutomator2 server data so the session starts from a clean server."""
         self.logger.info("Clearing UiAutomator2 server data...")
         try:
-            subprocess.run(['adb', 'shell', 'pm', 'clear', 'io.appium.uiautomator2.server'])
-            subprocess.run(['adb', 'shell', 'pm', 'clear', 'io.appium.uiautomator2.server.test'])
+            # One adb shell for both packages; the output isn't used
+            subprocess.run(
+                ['adb', 'shell', 'pm clear io.appium.uiautomator2.server; pm clear io.appium.uiautomator2.server.test'],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=10
+            )
         except Exception as e:
-            self.logger.warning(f"Failed to clear UiAutomator2 server: {str(e)}")
+            self.logger.warning("Failed to clear UiAutomator2 server: %s", e)
+
+    def _setup_driver(self):
+        """Set up and configure the Appium WebDriver."""
+        # Clear UiAutomator2 server data, or wait for a clear already under way
+        if self._clear_thread is not None:
+            self._clear_thread.join()
+            self._clear_thread = None
+        else:
+            self._clear_uiautomator2_server()
 
         # Set up driver options
         options = UiAutomator2Options()
@@ -292,6 +589,8 @@ class PagodaSearch:
         options.app_package = APP_PACKAGE
         options.app_activity = APP_ACTIVITY
         options.no_reset = True
+        # Stream the screen over MJPEG so frames don't need a screenshot call each
+        options.mjpeg_server_port = MJPEG_SERVER_PORT
 
         # Initialize driver with retry mechanism
         max_retries = 3
@@ -300,22 +599,47 @@ class PagodaSearch:
 
         while retry_count < max_retries:
             try:
-                self.logger.info(f"Attempting to initialize driver (attempt {retry_count + 1}/{max_retries})...")
+                self.logger.info("Attempting to initialize driver (attempt %d/%d)...", retry_count + 1, max_retries)
                 self.driver = webdriver.Remote(
                     command_executor=f'http://{APPIUM_HOST}:{APPIUM_PORT}',
                     options=options
                 )
                 self.logger.info("Driver initialization successful")
+                # A new session starts from the app's launch screen
+                self._nav_state = None
+                self._popups_dismissed_at = float('-inf')
                 
-                # Configure driver settings
+                # Configure driver settings; every lookup waits explicitly, so an
+                # implicit wait would only stack extra retries under each poll
                 self.driver.implicitly_wait(IMPLICIT_WAIT)
+
+                # Fix the image locator's options once so find_elements_by_image
+                # doesn't redo the match to build extra results per lookup
+                try:
+                    self.driver.update_settings({
+                        "imageMatchThreshold": IMAGE_MATCH_THRESHOLD,
+                        "fixImageTemplateSize": True,
+                        "fixImageFindScreenshotDims": True,
+                        "checkForImageElementStaleness": False,
+                        "getMatchedImageResult": False,
+                        "autoUpdateImageElementPosition": False,
+                    })
+                except WebDriverException as e:
+                    self.logger.warning("Failed to apply image locator settings: %s", e)
+
+                # Full-size frames, so templates match at the same scale as screenshots
+                try:
+                    self.driver.update_settings({"mjpegScalingFactor": 100})
+                    self._mjpeg_url = f"http://{APPIUM_HOST}:{MJPEG_SERVER_PORT}"
+                except WebDriverException as e:
+                    self.logger.info("MJPEG stream not available, using screenshots: %s", e)
                 time.sleep(INITIAL_WAIT)
                 
                 return
                 
             except Exception as e:
                 last_error = e
-                self.logger.warning(f"Failed to initialize driver: {str(e)}")
+                self.logger.warning("Failed to initialize driver: %s", e)
                 retry_count += 1
                 if retry_count < max_retries:
                     time.sleep(5)
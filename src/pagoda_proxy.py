@@ -1,7 +1,11 @@
 import json
 import os
+import queue
+import threading
+from collections import deque
 from pathlib import Path
 
+import orjson
 from mitmproxy import ctx
 
 # Get the project root directory
@@ -11,7 +15,32 @@ os.makedirs(data_dir, exist_ok=True)
 
 class RequestCapture:
     def __init__(self):
-        self.captured_requests = []
+        # Only the most recent requests stay in memory; the full history is on disk
+        self.captured_requests = deque(maxlen=1000)
+        # Disk writes happen on a separate thread so the proxy hooks never wait on I/O
+        self._writes = queue.Queue()
+        self._writer_thread = threading.Thread(target=self._writer, name="capture-writer", daemon=True)
+        self._writer_thread.start()
+
+    def _writer(self):
+        """Perform queued writes until the None sentinel arrives.
+
+        Items are (path, bytes) pairs that replace a file, or (None, line)
+        pairs appended to the captured requests as one JSON object per line.
+        """
+        with open(data_dir / "captured_requests.jsonl", "a", encoding="utf-8") as capture_file:
+            for path, data in iter(self._writes.get, None):
+                try:
+                    if path is None:
+                        capture_file.write(data)
+                        # Flush once the backlog is drained rather than per line
+                        if self._writes.empty():
+                            capture_file.flush()
+                    else:
+                        with open(path, "wb") as f:
+                            f.write(data)
+                except OSError as e:
+                    ctx.log.error(f"Failed to write capture data: {str(e)}")
 
     def request(self, flow):
         if "searchGoods" in flow.request.pretty_url:
@@ -27,20 +56,25 @@ class RequestCapture:
                 ),
             }
             self.captured_requests.append(request_data)
-
-            with open(data_dir / "captured_requests.json", "w", encoding="utf-8") as f:
-                json.dump(self.captured_requests, f, ensure_ascii=False, indent=2)
+            self._writes.put_nowait((None, json.dumps(request_data, ensure_ascii=False) + "\n"))
 
     def response(self, flow):
         if "searchGoods" in flow.request.pretty_url and flow.response:
             try:
-                response_data = json.loads(flow.response.content)
-                if "onSaleList" in str(response_data):
-                    with open(data_dir / "search_results.json", "w", encoding="utf-8") as f:
-                        json.dump(response_data, f, ensure_ascii=False, indent=2)
+                # Check the raw body before paying for a parse
+                raw = flow.response.content
+                if raw and b'"onSaleList"' in raw:
+                    # Parse only to make sure the body is valid JSON, then keep it as sent
+                    orjson.loads(raw)
+                    self._writes.put_nowait((data_dir / "search_results.json", raw))
                     ctx.log.info("Successfully captured search results")
             except Exception as e:
                 ctx.log.error(f"Failed to process response: {str(e)}")
 
+    def done(self):
+        # Let the writer finish what is queued, then close the capture file
+        self._writes.put(None)
+        self._writer_thread.join()
+
 
 addons = [RequestCapture()]
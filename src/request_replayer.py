@@ -1,23 +1,128 @@
 import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeout in seconds for each replayed request
+REQUEST_TIMEOUT = (3, 10)
+
+
+def load_jsonl(path):
+    """Load a JSON Lines file into a list, one object per non-empty line."""
+    with open(path, "rb") as f:
+        return [orjson.loads(line) for line in f if line.strip()]
+
+
+def make_body_builder(body_template, field="keywords"):
+    """Return a function that encodes body_template with field set to a given value.
+
+    The template is encoded once around a placeholder, so each call only has to
+    escape the new value and splice it between the cached prefix and suffix.
+    """
+    placeholder = "\x00placeholder\x00"
+    encoded = json.dumps({**body_template, field: placeholder}, ensure_ascii=False)
+    prefix, suffix = encoded.split(json.dumps(placeholder, ensure_ascii=False))
+
+    def build(value):
+        return prefix + json.dumps(value, ensure_ascii=False) + suffix
+
+    return build
+
+
+class RateLimiter:
+    """Token bucket that halves its rate on throttling responses and slowly recovers."""
+
+    def __init__(self, rate, min_rate, recovery_after=5):
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.rate = rate
+        self.recovery_after = recovery_after
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(1.0, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def record_response(self, status_code):
+        """Adjust the rate based on the server's response."""
+        with self._lock:
+            if status_code == 429 or status_code >= 500:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._tokens = 0.0
+                self._successes = 0
+                logger.warning(f"Server returned {status_code}, slowing down to {self.rate:.2f} req/s")
+            elif status_code < 400:
+                self._successes += 1
+                if self._successes >= self.recovery_after and self.rate < self.max_rate:
+                    self.rate = min(self.max_rate, self.rate + self.min_rate)
+                    self._successes = 0
+
 
 class RequestReplayer:
-    def __init__(self, capture_file="captured_requests.json"):
+    def __init__(self, capture_file="captured_requests.json", rate_limiter=None):
         self.capture_file = capture_file
+        self.rate_limiter = rate_limiter
+
+        # Reuse connections across replays instead of reconnecting per request.
+        # Sessions are not thread-safe, so each worker thread gets its own, all
+        # mounting this one adapter and its connection pool (sized for up to 32
+        # concurrent workers). Retries only cover connection failures;
+        # throttling responses are left to the rate limiter.
+        self._local = threading.local()
+        self._adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                connect=3,
+                read=0,
+                status=0,
+                respect_retry_after_header=False,
+                backoff_factor=0.3,
+            ),
+        )
+
+    @property
+    def session(self):
+        """The calling thread's session, created on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            self._local.session = session
+        return session
 
     def load_captured_requests(self):
         try:
-            with open(self.capture_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+            if str(self.capture_file).endswith((".jsonl", ".ndjson")):
+                return load_jsonl(self.capture_file)
+            with open(self.capture_file, "rb") as f:
+                return orjson.loads(f.read())
         except FileNotFoundError:
             logger.error(f"Capture file {self.capture_file} not found")
             return []
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.error(f"Invalid JSON in capture file {self.capture_file}")
             return []
 
@@ -36,6 +141,7 @@ class RequestReplayer:
                 "method": request_data["method"],
                 "url": request_data["url"],
                 "headers": request_data["headers"],
+                "timeout": REQUEST_TIMEOUT,
             }
 
             # Add optional fields if they exist
@@ -49,7 +155,11 @@ class RequestReplayer:
                 kwargs["data"] = request_data["body"]
 
             # Make the request
-            response = requests.request(**kwargs)
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            response = self.session.request(**kwargs)
+            if self.rate_limiter:
+                self.rate_limiter.record_response(response.status_code)
             
             # Validate response
             if response.status_code != 200:
@@ -66,8 +176,12 @@ class RequestReplayer:
             logger.error(f"Failed to replay request: {str(e)}")
             return None
 
-    def replay_with_modifications(self, param_variations):
-        """Replay requests with different parameter variations"""
+    def replay_with_modifications(self, param_variations, max_workers=16):
+        """Replay requests with different parameter variations.
+
+        The replays are independent, so they run on a thread pool sharing the
+        session's connection pool; results keep the serial order.
+        """
         results = []
         try:
             captured = self.load_captured_requests()
@@ -75,9 +189,9 @@ class RequestReplayer:
                 logger.error("No captured requests found")
                 return []
 
-            for request in captured:
-                for params in param_variations:
-                    result = self.replay_request(request, params)
+            tasks = [(request, params) for request in captured for params in param_variations]
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for result in executor.map(lambda task: self.replay_request(*task), tasks):
                     if result:
                         results.append(result)
 
@@ -34,16 +34,17 @@ logger = logging.getLogger(__name__)
 def start_automation_workflow():
     """Start the main automation workflow."""
     checker = PrerequisitesChecker()
+    pagoda = PagodaSearch()
     try:
-        # Step 1: Run all prerequisite checks
+        # Step 1: Run all prerequisite checks; the UiAutomator2 reset runs in the
+        # background while Appium and mitmproxy start
         logger.info("Step 1: Running prerequisite checks...")
-        if not checker.prepare_for_pagoda():
+        if not checker.prepare_for_pagoda(on_checks_passed=pagoda.clear_uiautomator2_async):
             logger.error("Failed to prepare environment. Please fix the issues above.")
             return False
             
-        # Step 2: Run Pagoda automation
+        # Step 2: Run Pagoda automation; the app is launched only now that the proxy is up
         logger.info("Step 2: Starting Pagoda automation...")
-        pagoda = PagodaSearch()
         try:
             pagoda.start_automation()
         finally:
@@ -30,3 +30,7 @@ SEARCH_KEYWORDS = [
     "车厘子",
     "柑",
 ]
+
+# Keyword of the search captured from the app; the rest are replayed from it
+INITIAL_KEYWORD = "苹果"
+KEYWORDS_TO_SEARCH = tuple(k for k in SEARCH_KEYWORDS if k != INITIAL_KEYWORD)
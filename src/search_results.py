@@ -0,0 +1,55 @@
+"""Helpers shared by the keyword search scripts for fetching, caching and saving search results."""
+
+import hashlib
+import logging
+import os
+
+import orjson
+from file_utils import atomic_write_bytes
+
+JSON_DUMP_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+logger = logging.getLogger(__name__)
+
+
+def request_digest(request):
+    """Hash the parts of a request that determine its search results."""
+    key = orjson.dumps([request.get("url"), request.get("method"), request.get("body")])
+    return hashlib.sha256(key).hexdigest()
+
+
+def is_cached(path, digest):
+    """Check whether path was already written for a request with this digest."""
+    try:
+        with open(f"{path}.sha256", "r", encoding="utf-8") as f:
+            return f.read().strip() == digest and os.path.exists(path)
+    except FileNotFoundError:
+        return False
+
+
+def mark_cached(path, digest):
+    """Record the digest of the request that produced path."""
+    with open(f"{path}.sha256", "w", encoding="utf-8") as f:
+        f.write(digest)
+
+
+def result_writer(results):
+    """Write queued (path, data, digest) results to disk until a None sentinel arrives."""
+    for path, data, digest in iter(results.get, None):
+        try:
+            # Results can be refetched, so skip the fsync here
+            atomic_write_bytes(path, data, fsync=False)
+            mark_cached(path, digest)
+        except Exception as e:
+            logger.error("Failed to save %s: %s", path, e)
+
+
+def search_keyword(replayer, keyword, out_path, request, digest, results):
+    """Replay a single keyword search and queue its results for writing."""
+    logger.info("Searching for: %s", keyword)
+
+    result = replayer.replay_request(request)
+    if result:
+        results.put((out_path, orjson.dumps(result, option=JSON_DUMP_OPTIONS), digest))
+    else:
+        logger.error("Failed to get results for keyword: %s", keyword)